@@ -0,0 +1,234 @@
+import os
+from urllib.parse import urlsplit, urlunsplit
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# Resource types the scrapers never read, approximated by file extension.
+# True type-based blocking (Fetch.enable with resourceType patterns) requires
+# answering every Fetch.requestPaused event with Fetch.failRequest, and
+# execute_cdp_cmd cannot receive events; an unanswered pause stalls the page
+# load. Network.setBlockedURLs needs no listener, so we match on URLs instead.
+# Resources served without a telltale extension still get through.
+RESOURCE_EXTENSIONS = {
+    "Image": ["png", "jpg", "jpeg", "gif", "webp", "svg", "ico", "avif"],
+    "Media": ["mp4", "webm", "mp3", "m3u8"],
+    "Font": ["woff", "woff2", "ttf", "otf"],
+}
+AD_PATTERNS = [
+    "*doubleclick.net*", "*googlesyndication.com*", "*googletagmanager.com*",
+    "*google-analytics.com*", "*adservice.google.*", "*amazon-adsystem.com*",
+    "*scorecardresearch.com*", "*quantserve.com*", "*chartbeat.*", "*taboola.com*",
+    "*outbrain.com*", "*pubmatic.com*", "*rubiconproject.com*", "*criteo.*",
+]
+
+
+def extension_patterns(extensions):
+    """URL globs for each extension, with and without a query string (CDN images often carry ?w=...)."""
+    return [p for ext in extensions for p in (f"*.{ext}", f"*.{ext}?*")]
+
+
+BLOCKED_URL_PATTERNS = extension_patterns(
+    ext for exts in RESOURCE_EXTENSIONS.values() for ext in exts
+) + AD_PATTERNS
+# Stylesheets are opt-in: .text / innerText depend on computed visibility,
+# so unstyled pages can change what the lyric selectors return.
+STYLESHEET_PATTERNS = extension_patterns(["css"])
+
+
+def google_base_url():
+    """Origin for Google searches; set GOOGLE_BASE_URL to point at a replay server."""
+    return os.environ.get("GOOGLE_BASE_URL", "https://www.google.com").rstrip("/")
+
+
+def genius_base_url():
+    """Origin for Genius pages; set GENIUS_BASE_URL to point at a replay server."""
+    return os.environ.get("GENIUS_BASE_URL", "https://genius.com").rstrip("/")
+
+
+def genius_url(url):
+    """Rewrite a genius.com URL onto genius_base_url(); other URLs pass through."""
+    parts = urlsplit(url)
+    if not parts.netloc.endswith("genius.com"):
+        return url
+    base = urlsplit(genius_base_url())
+    return urlunsplit((base.scheme, base.netloc, parts.path, parts.query, parts.fragment))
+
+
+def setup_driver(headless=True, page_load_timeout=None, block_resources=True, block_stylesheets=False,
+                 user_data_dir=None):
+    opts = Options()
+
+    # Persistent profile: cookies (including a solved CAPTCHA) survive a restart
+    if user_data_dir:
+        opts.add_argument(f"--user-data-dir={os.path.abspath(user_data_dir)}")
+
+    # Basic headless mode
+    if headless:
+        opts.add_argument("--headless=new")  # Use new headless mode
+
+    # Mimic real browser behavior
+    opts.add_argument("--disable-blink-features=AutomationControlled")
+    opts.add_experimental_option("excludeSwitches", ["enable-automation"])
+    opts.add_experimental_option('useAutomationExtension', False)
+
+    # Set realistic user agent
+    opts.add_argument(f"user-agent={USER_AGENT}")
+
+    # Window size to mimic real browser
+    opts.add_argument("--window-size=1920,1080")
+    opts.add_argument("--start-maximized")
+
+    # Additional flags for stability and stealth
+    opts.add_argument("--no-sandbox")
+    opts.add_argument("--disable-dev-shm-usage")
+    opts.add_argument("--disable-gpu")
+    opts.add_argument("--disable-extensions")
+    opts.add_argument("--disable-infobars")
+    opts.add_argument("--lang=en-US,en;q=0.9")
+    opts.add_argument("--disable-notifications")
+
+    if block_resources:
+        # Lean profile: no image decoding, no background work between pages
+        opts.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.default_content_setting_values.notifications": 2,
+        })
+        opts.add_argument("--blink-settings=imagesEnabled=false")
+        opts.add_argument("--disable-background-networking")
+        opts.add_argument("--disable-component-update")
+        opts.add_argument("--disable-default-apps")
+        opts.add_argument("--mute-audio")
+
+    driver = webdriver.Chrome(options=opts)
+
+    if page_load_timeout is not None:
+        driver.set_page_load_timeout(page_load_timeout)
+
+    # Remove webdriver property to further avoid detection
+    driver.execute_cdp_cmd('Network.setUserAgentOverride', {"userAgent": USER_AGENT})
+    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+
+    if block_resources:
+        # Drop non-essential requests before they hit the network
+        patterns = BLOCKED_URL_PATTERNS + (STYLESHEET_PATTERNS if block_stylesheets else [])
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+
+    return driver
+
+
+def driver_memory_mb(driver):
+    """
+    Resident memory of the browser, in MB.
+
+    Sums chromedriver and every Chrome child process when psutil is available,
+    otherwise falls back to the page's JS heap. Returns None if neither works.
+    """
+    if psutil is not None:
+        try:
+            proc = psutil.Process(driver.service.process.pid)
+            procs = [proc] + proc.children(recursive=True)
+            return sum(p.memory_info().rss for p in procs if p.is_running()) / 1e6
+        except (psutil.Error, AttributeError):
+            pass
+    try:
+        heap = driver.execute_script("return performance.memory ? performance.memory.usedJSHeapSize : null")
+        return heap / 1e6 if heap else None
+    except Exception:
+        return None
+
+
+def driver_is_healthy(driver):
+    """True if the browser session still answers commands."""
+    try:
+        driver.execute_script("return 1")
+        return True
+    except Exception:
+        return False
+
+
+class DriverManager:
+    """
+    Hands out a healthy driver per page and recycles it when due.
+
+    A fresh driver is started after max_pages pages, when browser memory
+    passes max_memory_mb, or when the session stops responding. Call
+    captcha_solved() after a manual CAPTCHA: the page-count recycle is then
+    held off for captcha_grace pages so the cookies that cleared it are not
+    thrown away. Pass user_data_dir to keep cookies across every recycle.
+    Extra keyword arguments go to setup_driver.
+    """
+
+    def __init__(self, max_pages=150, max_memory_mb=1500, check_every=10, captcha_grace=50, **driver_kwargs):
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+        self.check_every = check_every
+        self.captcha_grace = captcha_grace
+        self.driver_kwargs = driver_kwargs
+        self.driver = None
+        self.pages = 0
+        self.since_captcha = None
+        self.recycles = 0
+
+    def acquire(self):
+        """Return a driver for the next page, recycling the current one first if needed."""
+        if self.driver is not None and self._needs_recycle():
+            self.recycle()
+        if self.driver is None:
+            self.driver = setup_driver(**self.driver_kwargs)
+            self.pages = 0
+        self.pages += 1
+        if self.since_captcha is not None:
+            self.since_captcha += 1
+        return self.driver
+
+    def captcha_solved(self):
+        """Note that a CAPTCHA was just cleared in the current browser session."""
+        self.since_captcha = 0
+
+    def _in_captcha_grace(self):
+        return self.since_captcha is not None and self.since_captcha < self.captcha_grace
+
+    def _needs_recycle(self):
+        if self.pages >= self.max_pages and not self._in_captcha_grace():
+            print(f"♻️  Recycling driver after {self.pages} pages")
+            return True
+        if not driver_is_healthy(self.driver):
+            print("♻️  Recycling unresponsive driver")
+            return True
+        if self.pages % self.check_every == 0:
+            memory = driver_memory_mb(self.driver)
+            if memory is not None and memory > self.max_memory_mb:
+                print(f"♻️  Recycling driver at {memory:.0f} MB")
+                return True
+        return False
+
+    def recycle(self):
+        """Quit the current driver; the next acquire() starts a fresh one."""
+        self.quit()
+        self.recycles += 1
+        self.since_captcha = None
+
+    def quit(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            self.driver = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.quit()
+        return False
@@ -1,22 +1,16 @@
+import argparse
+
 import pandas as pd
 import numpy as np
 from pathlib import Path
 
-
-EMOTION_COLS = [
-    "anger_score",
-    "disgust_score",
-    "fear_score",
-    "joy_score",
-    "neutral_score",
-    "sadness_score",
-    "surprise_score",
-]
+from lyric_embeddings import embed_songs
+from lyrics_schema import EMOTION_COLS, read_lines
 
 
 def load_lyrics_with_emotions(csv_path: Path) -> pd.DataFrame:
-    """Load the per-line lyric emotions CSV."""
-    df = pd.read_csv(csv_path)
+    """Load the per-line lyric emotions CSV with canonical artist/title categoricals."""
+    df = read_lines(csv_path)
 
     missing = [c for c in EMOTION_COLS + ["artist", "title", "label", "score"] if c not in df.columns]
     if missing:
@@ -34,10 +28,12 @@ def compute_song_level_stats(df: pd.DataFrame) -> pd.DataFrame:
 
     group_cols = ["artist", "title"]
 
-    emotion_means = df.groupby(group_cols)[EMOTION_COLS].mean()
-    sentiment_mean = df.groupby(group_cols)["signed_sentiment"].mean().rename("avg_sentiment_score")
+    grouped = df.groupby(group_cols, observed=True)
+    emotion_means = grouped[EMOTION_COLS].mean()
+    sentiment_mean = grouped["signed_sentiment"].mean().rename("avg_sentiment_score")
 
     song_stats = pd.concat([emotion_means, sentiment_mean], axis=1).reset_index()
+    song_stats[group_cols] = song_stats[group_cols].astype(str)
     return song_stats
 
 
@@ -51,49 +47,87 @@ def build_nodes_df(song_stats: pd.DataFrame) -> pd.DataFrame:
     return nodes[cols]
 
 
-def compute_cosine_similarity_matrix(X: np.ndarray) -> np.ndarray:
-    """Compute cosine similarity matrix for rows of X."""
-    # Normalize rows to unit length
+def normalize_rows(X: np.ndarray) -> np.ndarray:
+    """Scale rows of X to unit length (zero rows stay zero)."""
     norms = np.linalg.norm(X, axis=1, keepdims=True)
     # Avoid division by zero
     norms[norms == 0] = 1.0
-    X_norm = X / norms
+    return X / norms
+
+
+def compute_cosine_similarity_matrix(X: np.ndarray) -> np.ndarray:
+    """Compute cosine similarity matrix for rows of X."""
+    X_norm = normalize_rows(X)
     # Cosine similarity is dot product of normalized vectors
     return np.dot(X_norm, X_norm.T)
 
 
-def build_edges_df(song_stats: pd.DataFrame, threshold: float = 0.7) -> pd.DataFrame:
+def emotion_features(song_stats: pd.DataFrame) -> np.ndarray:
+    """Song feature vectors: the averaged emotion scores."""
+    return song_stats[EMOTION_COLS].to_numpy(dtype=float)
+
+
+def lyric_features(df: pd.DataFrame, song_stats: pd.DataFrame, n_components: int = 256) -> np.ndarray:
+    """Song feature vectors: TF-IDF of each song's lyrics reduced by randomized SVD."""
+    keys = pd.MultiIndex.from_frame(song_stats[["artist", "title"]])
+    line_keys = pd.MultiIndex.from_arrays([df["artist"].astype(str), df["title"].astype(str)])
+    song_ids = keys.get_indexer(line_keys)
+    return embed_songs(df["lyric"], song_ids, len(song_stats), n_components=n_components)
+
+
+def build_edges_df(
+    song_stats: pd.DataFrame,
+    threshold: float = 0.7,
+    features: np.ndarray = None,
+    block_elements: int = 2**22,
+) -> pd.DataFrame:
     """
-    Create edge list where edge weight is cosine similarity over emotion vectors.
+    Create edge list where edge weight is cosine similarity over song feature vectors.
+
+    Features default to the emotion vectors. Similarities are computed a block
+    of rows at a time, so memory stays bounded by block_elements rather than
+    growing with the square of the number of songs.
 
     Only cross-artist edges are created (Drake–Kendrick), not within-artist edges.
     """
-    X = song_stats[EMOTION_COLS].to_numpy(dtype=float)
-    sim = compute_cosine_similarity_matrix(X)
+    X = emotion_features(song_stats) if features is None else np.asarray(features, dtype=float)
+    X_norm = normalize_rows(X)
 
-    ids = (song_stats["artist"] + " - " + song_stats["title"]).tolist()
-    artists = song_stats["artist"].tolist()
+    ids = (song_stats["artist"] + " - " + song_stats["title"]).to_numpy()
+    artist_codes, _ = pd.factorize(song_stats["artist"])
 
     sources = []
     targets = []
     weights = []
 
     n = len(ids)
-    for i in range(n):
-        for j in range(i + 1, n):
-            # Skip same-artist pairs; we only want Drake–Kendrick similarities
-            if artists[i] == artists[j]:
-                continue
-            w = float(sim[i, j])
-            if w >= threshold:
-                sources.append(ids[i])
-                targets.append(ids[j])
-                weights.append(w)
-
-    return pd.DataFrame({"source": sources, "target": targets, "weight": weights})
+    block = max(1, block_elements // max(n, 1))
+    for start in range(0, n, block):
+        stop = min(start + block, n)
+        sim = X_norm[start:stop] @ X_norm.T
+        rows = np.arange(start, stop)[:, None]
+        cols = np.arange(n)[None, :]
+        # Upper triangle only, and skip same-artist pairs; we only want Drake–Kendrick similarities
+        mask = (cols > rows) & (artist_codes[rows] != artist_codes[cols]) & (sim >= threshold)
+        i, j = np.nonzero(mask)
+        sources.append(ids[i + start])
+        targets.append(ids[j])
+        weights.append(sim[i, j])
+
+    if not sources:
+        return pd.DataFrame({"source": [], "target": [], "weight": []})
+    return pd.DataFrame(
+        {"source": np.concatenate(sources), "target": np.concatenate(targets), "weight": np.concatenate(weights)}
+    )
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Build the Drake–Kendrick song similarity graph.")
+    parser.add_argument("--features", choices=["emotion", "lyrics"], default="emotion")
+    parser.add_argument("--threshold", type=float, default=None)
+    parser.add_argument("--components", type=int, default=256)
+    args = parser.parse_args()
+
     root = Path(__file__).resolve().parent
     input_csv = root / "drake_kendrick_lyrics_with_emotions.csv"
 
@@ -101,10 +135,18 @@ def main():
     song_stats = compute_song_level_stats(df)
 
     nodes_df = build_nodes_df(song_stats)
-    edges_df = build_edges_df(song_stats, threshold=0.99)
-
-    nodes_out = root / "song_nodes_emotion_space.csv"
-    edges_out = root / "song_edges_emotion_similarity.csv"
+    if args.features == "lyrics":
+        features = lyric_features(df, song_stats, n_components=args.components)
+        threshold = 0.5 if args.threshold is None else args.threshold
+        nodes_out = root / "song_nodes_lyric_space.csv"
+        edges_out = root / "song_edges_lyric_similarity.csv"
+    else:
+        features = emotion_features(song_stats)
+        threshold = 0.99 if args.threshold is None else args.threshold
+        nodes_out = root / "song_nodes_emotion_space.csv"
+        edges_out = root / "song_edges_emotion_similarity.csv"
+
+    edges_df = build_edges_df(song_stats, threshold=threshold, features=features)
 
     nodes_df.to_csv(nodes_out, index=False)
     edges_df.to_csv(edges_out, index=False)
@@ -115,5 +157,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-
-
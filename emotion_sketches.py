@@ -0,0 +1,280 @@
+import pandas as pd
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.colors import to_rgba
+from matplotlib.lines import Line2D
+from itertools import combinations
+from pathlib import Path
+
+from lyrics_schema import EMOTION_COLS, canonical_artist, canonical_category
+
+
+# Emotion scores are probabilities in [0, 1], so fixed-width bins give
+# histograms that merge by addition. The fine grid doubles as the quantile
+# sketch (error <= 1 / QUANTILE_BINS); plots use coarser views of it.
+QUANTILE_BINS = 2000
+JOINT_BINS = 50
+PLOT_BINS = 100
+
+PAIRS = list(combinations(range(len(EMOTION_COLS)), 2))
+ARTIST_COLORS = {"drake": "#1f77b4", "kendrick": "#2ca02c"}
+
+
+def new_sketch() -> dict:
+    """Empty per-artist sketch: line count, fine histograms and pairwise joints."""
+    return {
+        "count": 0,
+        "hist": np.zeros((len(EMOTION_COLS), QUANTILE_BINS), dtype=np.int64),
+        "joint": np.zeros((len(PAIRS), JOINT_BINS, JOINT_BINS), dtype=np.int64),
+    }
+
+
+def update_sketch(sketch: dict, X: np.ndarray) -> dict:
+    """
+    Add a block of lines (rows of emotion scores) to a sketch in place.
+
+    Missing scores are skipped per column for the histograms and per pair
+    for the joints, matching emotion_summary; count is the number of lines
+    with at least one score.
+    """
+    missing = np.isnan(X)
+    X = X[~missing.all(axis=1)]
+    missing = missing[~missing.all(axis=1)]
+    n = len(X)
+    if n == 0:
+        return sketch
+
+    n_cols = len(EMOTION_COLS)
+    fine = np.clip((np.nan_to_num(X) * QUANTILE_BINS).astype(np.int64), 0, QUANTILE_BINS - 1)
+    flat = (fine + np.arange(n_cols) * QUANTILE_BINS)[~missing]
+    sketch["hist"] += np.bincount(flat, minlength=n_cols * QUANTILE_BINS).reshape(n_cols, QUANTILE_BINS)
+
+    coarse = fine // (QUANTILE_BINS // JOINT_BINS)
+    first = np.array([i for i, _ in PAIRS])
+    second = np.array([j for _, j in PAIRS])
+    pair_size = JOINT_BINS * JOINT_BINS
+    flat = np.arange(len(PAIRS)) * pair_size + coarse[:, first] * JOINT_BINS + coarse[:, second]
+    flat = flat[~(missing[:, first] | missing[:, second])]
+    sketch["joint"] += np.bincount(flat, minlength=len(PAIRS) * pair_size).reshape(
+        len(PAIRS), JOINT_BINS, JOINT_BINS
+    )
+
+    sketch["count"] += n
+    return sketch
+
+
+def merge_sketches(a: dict, b: dict) -> dict:
+    """Combine two sketches built from disjoint sets of lines."""
+    return {
+        "count": a["count"] + b["count"],
+        "hist": a["hist"] + b["hist"],
+        "joint": a["joint"] + b["joint"],
+    }
+
+
+def build_sketches(csv_path: Path, group_col: str = "artist", chunksize: int = 200_000) -> dict:
+    """Stream the line table once and return {artist: sketch}."""
+    sketches = {}
+    for chunk in pd.read_csv(csv_path, usecols=[group_col] + EMOTION_COLS, chunksize=chunksize):
+        if group_col == "artist":
+            chunk["artist"] = canonical_category(chunk["artist"], canonical_artist)
+        for name, part in chunk.groupby(group_col, sort=False, observed=True):
+            sketch = sketches.setdefault(name, new_sketch())
+            update_sketch(sketch, part[EMOTION_COLS].to_numpy(dtype=float))
+    return sketches
+
+
+def sketch_quantiles(hist: np.ndarray, qs) -> np.ndarray:
+    """Approximate quantiles of one emotion from its fine histogram."""
+    cdf = np.cumsum(hist)
+    total = cdf[-1]
+    if total == 0:
+        return np.full(len(qs), np.nan)
+
+    out = []
+    for q in qs:
+        target = q * total
+        b = int(np.searchsorted(cdf, target, side="left"))
+        b = min(b, len(hist) - 1)
+        before = cdf[b - 1] if b > 0 else 0
+        frac = (target - before) / hist[b] if hist[b] else 0.0
+        out.append((b + frac) / len(hist))
+    return np.array(out)
+
+
+def coarsen(hist: np.ndarray, bins: int = PLOT_BINS) -> np.ndarray:
+    """Sum adjacent fine bins down to `bins` bins along the last axis."""
+    return hist.reshape(hist.shape[:-1] + (bins, hist.shape[-1] // bins)).sum(axis=-1)
+
+
+def smooth_grid(grid: np.ndarray, passes: int = 2) -> np.ndarray:
+    """Blur a 2-D count grid with a [1, 2, 1] binomial kernel along both axes."""
+    out = grid.astype(float)
+    for _ in range(passes):
+        for axis in (0, 1):
+            padded = np.pad(out, [(1, 1) if a == axis else (0, 0) for a in (0, 1)], mode="edge")
+            lo = padded[:-2] if axis == 0 else padded[:, :-2]
+            mid = padded[1:-1] if axis == 0 else padded[:, 1:-1]
+            hi = padded[2:] if axis == 0 else padded[:, 2:]
+            out = (lo + 2 * mid + hi) / 4
+    return out
+
+
+def save_sketches(sketches: dict, out_path: Path):
+    """Write sketches to a single compressed .npz file."""
+    arrays = {}
+    for name, sketch in sketches.items():
+        arrays[f"{name}__count"] = np.array(sketch["count"])
+        arrays[f"{name}__hist"] = sketch["hist"]
+        arrays[f"{name}__joint"] = sketch["joint"]
+    np.savez_compressed(out_path, **arrays)
+
+
+def load_sketches(path: Path) -> dict:
+    """Inverse of save_sketches."""
+    sketches = {}
+    with np.load(path) as data:
+        for key in data.files:
+            name, field = key.rsplit("__", 1)
+            value = data[key]
+            sketches.setdefault(name, {})[field] = int(value) if field == "count" else value
+    return sketches
+
+
+def plot_violins(sketches: dict, out_path: Path, artists=("drake", "kendrick")):
+    """Violin + box plot per emotion, drawn from histograms rather than raw lines."""
+    fig, axes = plt.subplots(2, 4, figsize=(20, 10))
+    axes = axes.flatten()
+    centers = (np.arange(PLOT_BINS) + 0.5) / PLOT_BINS
+
+    for idx, col in enumerate(EMOTION_COLS):
+        ax = axes[idx]
+        for pos, artist in enumerate(artists):
+            sketch = sketches[artist]
+            density = coarsen(sketch["hist"][idx]).astype(float)
+            if density.max() > 0:
+                density = 0.4 * density / density.max()
+            color = ARTIST_COLORS.get(artist, "gray")
+            ax.fill_betweenx(centers, pos - density, pos + density, color=color, alpha=0.7)
+
+            q25, q50, q75 = sketch_quantiles(sketch["hist"][idx], (0.25, 0.5, 0.75))
+            ax.vlines(pos, q25, q75, color="black", linewidth=4)
+            ax.scatter([pos], [q50], color="white", s=15, zorder=3)
+
+        emotion_name = col.replace("_score", "").capitalize()
+        ax.set_title(emotion_name, fontsize=14, fontweight="bold")
+        ax.set_xticks(range(len(artists)))
+        ax.set_xticklabels([a.capitalize() for a in artists])
+        ax.set_ylabel(f"{emotion_name} Score", fontsize=11)
+        ax.set_ylim(-0.05, 1.05)
+        ax.grid(axis="y", alpha=0.3, linestyle="--", linewidth=0.5)
+
+    fig.delaxes(axes[7])
+    plt.suptitle("Emotion Range Distribution: Drake vs Kendrick Lamar", fontsize=18, fontweight="bold", y=1.00)
+    plt.tight_layout()
+    plt.savefig(out_path, dpi=150, bbox_inches="tight")
+    plt.close(fig)
+
+
+def plot_range_by_artist(sketches: dict, out_path: Path, artists=("drake", "kendrick")):
+    """
+    Per-emotion density strips with min/max whiskers, drawn from histograms.
+
+    Replaces the sampled strip plot: each artist gets a band shaded by the
+    (log) share of lines at each score, so every line counts and the sparse
+    tails stay visible.
+    """
+    fig, axes = plt.subplots(2, 4, figsize=(20, 10))
+    axes = axes.flatten()
+
+    for idx, col in enumerate(EMOTION_COLS):
+        ax = axes[idx]
+        for pos, artist in enumerate(artists):
+            hist = sketches[artist]["hist"][idx]
+            color = ARTIST_COLORS.get(artist, "gray")
+            density = np.log1p(coarsen(hist).astype(float))
+            if density.max() > 0:
+                density /= density.max()
+
+            band = np.tile(to_rgba(color), (PLOT_BINS, 1, 1))
+            band[:, 0, 3] = density
+            ax.imshow(band, origin="lower", aspect="auto", extent=(pos - 0.3, pos + 0.3, 0, 1), interpolation="nearest")
+
+            filled = np.flatnonzero(hist)
+            if len(filled):
+                lo, hi = filled[0] / len(hist), (filled[-1] + 1) / len(hist)
+                ax.vlines(pos, lo, hi, color=color, linewidth=1)
+                ax.hlines([lo, hi], pos - 0.1, pos + 0.1, color=color, linewidth=1.5)
+
+        emotion_name = col.replace("_score", "").capitalize()
+        ax.set_title(emotion_name, fontsize=14, fontweight="bold")
+        ax.set_xlim(-0.5, len(artists) - 0.5)
+        ax.set_xticks(range(len(artists)))
+        ax.set_xticklabels([a.capitalize() for a in artists])
+        ax.set_ylabel(f"{emotion_name} Score", fontsize=11)
+        ax.set_ylim(-0.05, 1.05)
+        ax.grid(axis="y", alpha=0.3)
+
+    fig.delaxes(axes[7])
+    plt.tight_layout()
+    plt.savefig(out_path, dpi=150, bbox_inches="tight")
+    plt.close(fig)
+
+
+def plot_pair_densities(sketches: dict, out_path: Path, artists=("drake", "kendrick"), cols=None):
+    """Pairplot-style grid of joint-density contours over every line."""
+    cols = cols or [c for c in EMOTION_COLS if c != "neutral_score"]
+    col_idx = [EMOTION_COLS.index(c) for c in cols]
+    pair_pos = {pair: p for p, pair in enumerate(PAIRS)}
+    centers = (np.arange(JOINT_BINS) + 0.5) / JOINT_BINS
+    fine_centers = (np.arange(PLOT_BINS) + 0.5) / PLOT_BINS
+
+    k = len(cols)
+    fig, axes = plt.subplots(k, k, figsize=(2.5 * k, 2.5 * k), squeeze=False)
+    for r, i in enumerate(col_idx):
+        for c, j in enumerate(col_idx):
+            ax = axes[r][c]
+            for artist in artists:
+                sketch = sketches[artist]
+                color = ARTIST_COLORS.get(artist, "gray")
+                if i == j:
+                    density = coarsen(sketch["hist"][i]) / max(sketch["hist"][i].sum(), 1)
+                    ax.plot(fine_centers, density, color=color, linewidth=2)
+                    continue
+                joint = sketch["joint"][pair_pos[(min(i, j), max(i, j))]]
+                # joint is indexed [lower emotion, higher emotion]; contour wants [y, x]
+                grid = joint if i < j else joint.T
+                # Raw 50x50 counts are speckled in the sparse tails; blur before contouring
+                ax.contour(centers, centers, np.log1p(smooth_grid(grid)), levels=5, colors=color, linewidths=0.8)
+            if r == k - 1:
+                ax.set_xlabel(cols[c].replace("_score", "").capitalize())
+            if c == 0:
+                ax.set_ylabel(cols[r].replace("_score", "").capitalize())
+
+    handles = [Line2D([], [], color=ARTIST_COLORS.get(a, "gray"), linewidth=2, label=a.capitalize()) for a in artists]
+    fig.legend(handles=handles, title="artist", loc="center left", bbox_to_anchor=(1.0, 0.5), frameon=False)
+    fig.suptitle("Emotion Distribution Pairplot: Drake vs Kendrick Lamar", y=1.02, fontsize=16, fontweight="bold")
+    plt.tight_layout()
+    plt.savefig(out_path, dpi=150, bbox_inches="tight")
+    plt.close(fig)
+
+
+def main():
+    root = Path(__file__).resolve().parent
+    input_csv = root / "drake_kendrick_lyrics_with_emotions.csv"
+
+    sketches = build_sketches(input_csv)
+
+    sketches_out = root / "emotion_sketches.npz"
+    save_sketches(sketches, sketches_out)
+    print(f"Wrote sketches to: {sketches_out}")
+
+    if all(a in sketches for a in ARTIST_COLORS):
+        plot_violins(sketches, root / "viz" / "emotion_violin_plots.png")
+        plot_pair_densities(sketches, root / "viz" / "emotion_pairplot.png")
+        plot_range_by_artist(sketches, root / "viz" / "emotion_range_by_artist.png")
+        print("Wrote plots to: viz/emotion_violin_plots.png, viz/emotion_pairplot.png, viz/emotion_range_by_artist.png")
+
+
+if __name__ == "__main__":
+    main()
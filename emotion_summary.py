@@ -0,0 +1,134 @@
+import argparse
+import warnings
+
+import pandas as pd
+import numpy as np
+from pathlib import Path
+
+from build_song_similarity_graph import load_lyrics_with_emotions
+from lyrics_schema import CANONICAL_ARTISTS, EMOTION_COLS
+
+
+QUANTILES = (0.25, 0.5, 0.75)
+
+
+def group_row_indices(keys: pd.Series):
+    """
+    Return (group_names, list of row-index arrays), one array per group.
+
+    Rows are bucketed with a single stable argsort over integer group codes,
+    so the value columns themselves are never sorted. Rows with a missing key
+    are dropped, matching pandas groupby.
+    """
+    codes, names = pd.factorize(keys, sort=True)
+    order = np.argsort(codes, kind="stable")
+    order = order[codes[order] >= 0]
+    bounds = np.searchsorted(codes[order], np.arange(len(names) + 1))
+    return list(names), [order[bounds[g]:bounds[g + 1]] for g in range(len(names))]
+
+
+def top_k_indices(block: np.ndarray, k: int) -> np.ndarray:
+    """
+    Row indices of the k largest values in each column of block, best first.
+
+    Uses argpartition so only the k winners per column are ordered.
+    Returns an array of shape (min(k, n_rows), n_cols).
+    """
+    n = block.shape[0]
+    if k <= 0 or n == 0:
+        return np.empty((0, block.shape[1]), dtype=np.intp)
+    if k >= n:
+        return np.argsort(-block, axis=0, kind="stable")
+
+    part = np.argpartition(-block, k - 1, axis=0)[:k]
+    vals = np.take_along_axis(block, part, axis=0)
+    order = np.argsort(-vals, axis=0, kind="stable")
+    return np.take_along_axis(part, order, axis=0)
+
+
+def summarize_emotions(
+    df: pd.DataFrame,
+    group_col: str = "artist",
+    text_col: str = "lyric",
+    top_k: int = 3,
+) -> pd.DataFrame:
+    """
+    Per-group emotion summary in one pass over the emotion columns.
+
+    Returns one row per (group, emotion) with count, mean, std, min, max,
+    range, quartiles, IQR and the top_k highest-scoring lines. Missing scores
+    are skipped per column, as pandas groupby does; count is the number of
+    scored lines for that emotion.
+    """
+    X = df[EMOTION_COLS].to_numpy(dtype=float)
+    texts = df[text_col].to_numpy(dtype=object)
+    names, groups = group_row_indices(df[group_col])
+
+    rows = []
+    for name, idx in zip(names, groups):
+        block = X[idx]
+        missing = np.isnan(block)
+        counts = (~missing).sum(axis=0)
+
+        with warnings.catch_warnings():
+            # All-NaN columns legitimately produce NaN statistics
+            warnings.simplefilter("ignore", RuntimeWarning)
+            mean = np.nanmean(block, axis=0)
+            std = np.where(counts > 1, np.nanstd(block, axis=0, ddof=1), np.nan)
+            lo = np.nanmin(block, axis=0)
+            hi = np.nanmax(block, axis=0)
+            q25, q50, q75 = np.nanquantile(block, QUANTILES, axis=0)
+        top = top_k_indices(np.where(missing, -np.inf, block), top_k)
+
+        for j, col in enumerate(EMOTION_COLS):
+            row = {
+                group_col: name,
+                "emotion": col.replace("_score", ""),
+                "count": int(counts[j]),
+                "mean": mean[j],
+                "std": std[j],
+                "min": lo[j],
+                "max": hi[j],
+                "range": hi[j] - lo[j],
+                "q25": q25[j],
+                "median": q50[j],
+                "q75": q75[j],
+                "iqr": q75[j] - q25[j],
+            }
+            for rank in range(top_k):
+                if rank < min(len(top), counts[j]):
+                    r = idx[top[rank, j]]
+                    row[f"top{rank + 1}_lyric"] = texts[r]
+                    row[f"top{rank + 1}_score"] = X[r, j]
+                else:
+                    row[f"top{rank + 1}_lyric"] = None
+                    row[f"top{rank + 1}_score"] = np.nan
+            rows.append(row)
+
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-artist emotion summary.")
+    parser.add_argument("--all-artists", action="store_true",
+                        help="include featured artists instead of only drake and kendrick")
+    parser.add_argument("--top-k", type=int, default=3)
+    args = parser.parse_args()
+
+    root = Path(__file__).resolve().parent
+    input_csv = root / "drake_kendrick_lyrics_with_emotions.csv"
+
+    df = load_lyrics_with_emotions(input_csv)
+    if not args.all_artists:
+        df = df[df["artist"].isin(CANONICAL_ARTISTS)]
+        df["artist"] = df["artist"].cat.remove_unused_categories()
+    summary = summarize_emotions(df, top_k=args.top_k)
+
+    summary_out = root / "emotion_summary_by_artist.csv"
+    summary.to_csv(summary_out, index=False)
+
+    print(f"Wrote emotion summary to: {summary_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+import argparse
+import hashlib
+import html
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from pacing import RateGovernor
+
+
+PER_PAGE = 50
+
+
+def genius_api_base_url():
+    """Genius API origin; set GENIUS_API_BASE_URL to point at a mock server."""
+    return os.environ.get("GENIUS_API_BASE_URL", "https://api.genius.com").rstrip("/")
+
+
+class GeniusClient:
+    """
+    Thread-safe Genius API client with one pooled session and an on-disk cache.
+
+    Responses fetched with use_cache=True are cached as JSON under cache_dir,
+    keyed by path and params. Only immutable lookups (/songs/<id>, /search)
+    use the cache; artist listings change with every release and are always
+    fetched fresh. Requests are paced by a shared RateGovernor; HTTP 429 counts as a block.
+    """
+
+    def __init__(self, token, base_url=None, cache_dir="genius_cache", workers=8, governor=None, timeout=15):
+        self.base_url = (base_url or genius_api_base_url()).rstrip("/")
+        self.cache_dir = Path(cache_dir)
+        self.workers = workers
+        self.timeout = timeout
+        self.governor = governor or RateGovernor(rate=5.0, max_rate=20.0, burst=workers, cooldown=10.0)
+
+        retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(500, 502, 503, 504), allowed_methods=["GET"])
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Authorization": f"Bearer {token}", "User-Agent": "kendickLamarVDrake-catalog"})
+
+    def get(self, path, params=None, use_cache=True, max_attempts=5):
+        """GET an API path and return its "response" object."""
+        params = params or {}
+        cache_file = self._cache_file(path, params)
+        if use_cache and cache_file.exists():
+            with open(cache_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+
+        for attempt in range(max_attempts):
+            self.governor.wait()
+            try:
+                r = self.session.get(self.base_url + path, params=params, timeout=self.timeout)
+            except requests.Timeout:
+                self.governor.record("timeout")
+                continue
+            except requests.RequestException:
+                self.governor.record("error")
+                raise
+
+            if r.status_code == 429:
+                self.governor.record("captcha")
+                time.sleep(float(r.headers.get("Retry-After", 2 ** attempt)))
+                continue
+            if r.status_code >= 400:
+                self.governor.record("error")
+                r.raise_for_status()
+
+            self.governor.record("ok")
+            data = r.json()["response"]
+            if use_cache:
+                self._write_cache(cache_file, data)
+            return data
+
+        raise RuntimeError(f"Giving up on {path} after {max_attempts} attempts")
+
+    def find_artist_id(self, name):
+        """Genius artist ID for name, preferring an exact primary-artist match."""
+        hits = self.get("/search", {"q": name})["hits"]
+        artists = [hit["result"]["primary_artist"] for hit in hits if hit.get("type") == "song"]
+        for artist in artists:
+            if artist["name"].lower() == name.lower():
+                return artist["id"]
+        if not artists:
+            raise ValueError(f"No Genius artist found for {name!r}")
+        return artists[0]["id"]
+
+    def artist_songs_page(self, artist_id, page, sort="release_date"):
+        params = {"per_page": PER_PAGE, "page": page, "sort": sort}
+        return self.get(f"/artists/{artist_id}/songs", params, use_cache=False)
+
+    def song(self, song_id):
+        return self.get(f"/songs/{song_id}")["song"]
+
+    def _cache_file(self, path, params):
+        key = path + "?" + "&".join(f"{k}={v}" for k, v in sorted(params.items()))
+        return self.cache_dir / (hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json")
+
+    def _write_cache(self, cache_file, data):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = cache_file.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp, cache_file)
+
+
+def load_catalog(path: Path) -> dict:
+    if not path.exists():
+        return {"artist": None, "artist_id": None, "last_sync": None, "songs": {}, "listed_ids": []}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_catalog(catalog: dict, path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(catalog, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def release_key(song):
+    """Sortable "YYYY-MM-DD" release date from release_date_components, or None if undated."""
+    parts = song.get("release_date_components") or {}
+    if not parts.get("year"):
+        return None
+    return f"{parts['year']:04d}-{parts.get('month') or 0:02d}-{parts.get('day') or 0:02d}"
+
+
+def song_record(song):
+    """The fields we keep per song."""
+    return {
+        "id": song["id"],
+        "title": song.get("title"),
+        "url": song.get("url"),
+        "primary_artist": (song.get("primary_artist") or {}).get("name"),
+        "release_date": song.get("release_date_for_display") or song.get("release_date"),
+        "released": release_key(song),
+    }
+
+
+def discover_catalog(client, artist_name, catalog_path: Path, incremental=True, sort="release_date",
+                     only_primary=True, with_details=False):
+    """
+    Page through an artist's songs and merge them into the catalog file.
+
+    Pages are requested concurrently, up to client.workers at a time, and
+    listings are never served from the cache. Full mode walks every page and
+    diffs song IDs against the catalog. Incremental mode stops early only
+    once the release dates it has read prove the rest of the listing is
+    older than the newest song already in the catalog: the page must hold
+    no unseen IDs (counted before the only_primary filter, so a page of
+    features does not end the sync), its newest dated song must be older
+    than that cutoff, and every page so far must have been in newest-first
+    order. Otherwise it keeps walking, as in full mode. Songs added to
+    Genius with an old release date need a full sync.
+    Returns the list of newly added song records.
+    """
+    catalog = load_catalog(catalog_path)
+    if catalog["artist_id"] is None or catalog["artist"] != artist_name:
+        catalog.update({"artist": artist_name, "artist_id": client.find_artist_id(artist_name),
+                        "songs": {}, "listed_ids": []})
+    artist_id = catalog["artist_id"]
+    listed = set(catalog.get("listed_ids", [])) | set(catalog["songs"])
+    dates = [s.get("released") for s in catalog["songs"].values() if s.get("released")]
+    cutoff = max(dates, default=None)
+    incremental = incremental and cutoff is not None
+    in_order = True
+    oldest_so_far = None
+
+    added = {}
+    with ThreadPoolExecutor(client.workers) as pool:
+        page = 1
+        # Incremental syncs usually end on page 1, so start small and widen
+        wave = 1 if incremental else client.workers
+        done = False
+        while not done:
+            pages = range(page, page + wave)
+            responses = pool.map(lambda p: client.artist_songs_page(artist_id, p, sort), pages)
+            for response in responses:
+                unseen = 0
+                for song in response["songs"]:
+                    key = str(song["id"])
+                    if key in catalog["songs"] and "released" not in catalog["songs"][key]:
+                        # Catalogs from before release dates were kept
+                        catalog["songs"][key]["released"] = release_key(song)
+                    if key in listed:
+                        continue
+                    listed.add(key)
+                    unseen += 1
+                    if only_primary and song.get("primary_artist", {}).get("id") != artist_id:
+                        continue
+                    added[key] = song_record(song)
+
+                page_dates = [d for d in map(release_key, response["songs"]) if d]
+                if page_dates:
+                    ordered = page_dates == sorted(page_dates, reverse=True)
+                    in_order = in_order and ordered and (oldest_so_far is None or page_dates[0] <= oldest_so_far)
+                    oldest_so_far = page_dates[-1]
+                caught_up = (incremental and in_order and unseen == 0
+                             and bool(page_dates) and page_dates[0] < cutoff)
+                if response.get("next_page") is None or caught_up:
+                    done = True
+                    break
+            page += wave
+            wave = min(wave * 2, client.workers)
+
+        if with_details and added:
+            for song in pool.map(client.song, [int(k) for k in added]):
+                added[str(song["id"])].update(song_record(song))
+                added[str(song["id"])]["album"] = (song.get("album") or {}).get("name")
+
+    catalog["songs"].update(added)
+    catalog["listed_ids"] = sorted(listed, key=int)
+    catalog["last_sync"] = time.strftime("%Y-%m-%d %H:%M:%S")
+    save_catalog(catalog, catalog_path)
+    return list(added.values())
+
+
+def write_song_list(catalog: dict, path: Path):
+    """Write the catalog as the href/<h3> snippets the Google scrapers read."""
+    with open(path, "w", encoding="utf-8") as f:
+        for song in catalog["songs"].values():
+            f.write(f'<a href="{html.escape(song["url"])}"><h3>{html.escape(song["title"], quote=False)}</h3></a>\n')
+
+
+class MockGeniusHandler(BaseHTTPRequestHandler):
+    """Minimal Genius API: /search, /artists/<id>/songs and /songs/<id>."""
+
+    def do_GET(self):
+        server = self.server
+        time.sleep(server.latency)
+        server.count()
+        if not self.headers.get("Authorization", "").startswith("Bearer "):
+            return self._json(401, {"meta": {"status": 401}})
+
+        parts = urlsplit(self.path)
+        query = dict(parse_qsl(parts.query))
+
+        if parts.path == "/search":
+            hits = [{"type": "song", "result": song} for song in server.songs[:10]]
+            return self._json(200, {"meta": {"status": 200}, "response": {"hits": hits}})
+
+        m = re.fullmatch(r"/artists/(\d+)/songs", parts.path)
+        if m:
+            page = int(query.get("page", 1))
+            per_page = int(query.get("per_page", 20))
+            songs = server.songs[(page - 1) * per_page:page * per_page]
+            next_page = page + 1 if page * per_page < len(server.songs) else None
+            return self._json(200, {"meta": {"status": 200}, "response": {"songs": songs, "next_page": next_page}})
+
+        m = re.fullmatch(r"/songs/(\d+)", parts.path)
+        if m and int(m.group(1)) in server.by_id:
+            song = dict(server.by_id[int(m.group(1))], album={"name": "Mock Album"})
+            return self._json(200, {"meta": {"status": 200}, "response": {"song": song}})
+
+        self._json(404, {"meta": {"status": 404}})
+
+    def _json(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+MOCK_EPOCH = date(2005, 1, 1)
+
+
+class MockGeniusServer(ThreadingHTTPServer):
+    """
+    Local stand-in for api.genius.com with n_songs songs by one artist.
+
+    Songs are listed newest first; add_songs() simulates new releases and,
+    with featured=True, songs where the artist only features.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 0), artist="Drake", artist_id=130, n_songs=300, latency=0.05):
+        super().__init__(address, MockGeniusHandler)
+        self.artist = {"id": artist_id, "name": artist}
+        self.latency = latency
+        self.requests = 0
+        self.songs = []
+        self.by_id = {}
+        self._lock = threading.Lock()
+        self.add_songs(n_songs)
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def add_songs(self, n, featured=False):
+        primary = {"id": self.artist["id"] + 1, "name": "Other Artist"} if featured else self.artist
+        with self._lock:
+            start = max(self.by_id, default=0) + 1
+            new = []
+            for i in range(start, start + n):
+                released = MOCK_EPOCH + timedelta(days=i)
+                new.append({
+                    "id": i,
+                    "title": f"Song {i}",
+                    "url": f"https://genius.com/mock-song-{i}-lyrics",
+                    "primary_artist": primary,
+                    "release_date_for_display": released.strftime("%B %d, %Y"),
+                    "release_date_components": {"year": released.year, "month": released.month, "day": released.day},
+                })
+            self.songs = list(reversed(new)) + self.songs
+            self.by_id.update({s["id"]: s for s in new})
+
+    def count(self):
+        with self._lock:
+            self.requests += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Discover an artist's song catalog via the Genius API.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sync = sub.add_parser("sync")
+    sync.add_argument("artist")
+    sync.add_argument("--catalog", default=None, help="catalog JSON (default: catalog/<artist>.json)")
+    sync.add_argument("--full", action="store_true", help="walk every page (also finds back-catalog additions)")
+    sync.add_argument("--workers", type=int, default=8)
+    sync.add_argument("--details", action="store_true", help="also fetch /songs/<id> for new songs")
+    sync.add_argument("--cache-dir", default="genius_cache")
+    sync.add_argument("--song-list", default=None, help="also write a scraper song list (e.g. drake/all_songs.txt)")
+
+    mock = sub.add_parser("mock")
+    mock.add_argument("--port", type=int, default=8766)
+    mock.add_argument("--songs", type=int, default=300)
+
+    args = parser.parse_args()
+
+    if args.command == "mock":
+        server = MockGeniusServer(("127.0.0.1", args.port), n_songs=args.songs)
+        print(f"Mock Genius API at {server.base_url} (use GENIUS_API_BASE_URL={server.base_url})")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return
+
+    token = os.environ.get("GENIUS_ACCESS_TOKEN")
+    if not token:
+        raise SystemExit("Set GENIUS_ACCESS_TOKEN to a Genius API client access token")
+
+    slug = re.sub(r"[^a-z0-9]+", "_", args.artist.lower()).strip("_")
+    catalog_path = Path(args.catalog or f"catalog/{slug}.json")
+    client = GeniusClient(token, cache_dir=args.cache_dir, workers=args.workers)
+
+    start = time.perf_counter()
+    added = discover_catalog(client, args.artist, catalog_path, incremental=not args.full, with_details=args.details)
+    elapsed = time.perf_counter() - start
+
+    catalog = load_catalog(catalog_path)
+    print(f"Added {len(added)} songs ({len(catalog['songs'])} total) in {elapsed:.1f}s")
+    print(f"Pacing: {client.governor.stats()}")
+    print(f"Wrote catalog to: {catalog_path}")
+
+    if args.song_list:
+        write_song_list(catalog, Path(args.song_list))
+        print(f"Wrote song list to: {args.song_list}")
+
+
+if __name__ == "__main__":
+    main()
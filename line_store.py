@@ -0,0 +1,130 @@
+import json
+
+import pandas as pd
+import numpy as np
+from pathlib import Path
+
+from lyrics_schema import SCORE_COLS, apply_schema, read_lines
+
+
+SONG_COLS = ["artist", "title", "url"]
+# Columns that are a function of the lyric text alone (the model outputs)
+LINE_ATTRS = SCORE_COLS + ["pred", "label"]
+
+
+def intern_lines(df: pd.DataFrame, text_col: str = "lyric", song_cols=SONG_COLS, line_attrs=LINE_ATTRS) -> dict:
+    """
+    Split a line table into unique lines, songs and per-occurrence line IDs.
+
+    Only line_attrs are stored once per distinct text; raises ValueError if
+    any of them differs between occurrences of the same text. Any other
+    column (an index column, notes, ...) is kept per occurrence.
+
+    Returns a dict with:
+      lines       one row per distinct text with its line_attrs
+      songs       one row per distinct song_cols combination
+      occurrences {"song_id", "position", "line_id"} int32 arrays, in the
+                  original row order; position counts lines within a song
+      extra       remaining columns, one row per occurrence (may be empty)
+      columns     the original column order, for reconstruction
+      text_col    name of the lyric text column
+    """
+    song_cols = [c for c in song_cols if c in df.columns]
+    line_cols = [text_col] + [c for c in line_attrs if c in df.columns and c != text_col]
+    extra_cols = [c for c in df.columns if c not in song_cols and c not in line_cols]
+
+    line_ids, _ = pd.factorize(df[text_col], use_na_sentinel=False)
+    song_ids = df.groupby(song_cols, sort=False, observed=True, dropna=False).ngroup().to_numpy()
+
+    if len(line_cols) > 1:
+        distinct = df[line_cols[1:]].groupby(line_ids).nunique(dropna=False).max()
+        conflicting = distinct.index[distinct > 1].tolist()
+        if conflicting:
+            raise ValueError(f"Columns {conflicting} differ between occurrences of the same {text_col!r}")
+
+    _, first_line_rows = np.unique(line_ids, return_index=True)
+    _, first_song_rows = np.unique(song_ids, return_index=True)
+    lines = df[line_cols].iloc[first_line_rows].reset_index(drop=True)
+    songs = df[song_cols].iloc[first_song_rows].reset_index(drop=True)
+
+    positions = pd.Series(song_ids).groupby(song_ids).cumcount().to_numpy()
+
+    return {
+        "lines": lines,
+        "songs": songs,
+        "occurrences": {
+            "song_id": song_ids.astype(np.int32),
+            "position": positions.astype(np.int32),
+            "line_id": line_ids.astype(np.int32),
+        },
+        "extra": df[extra_cols].reset_index(drop=True),
+        "columns": list(df.columns),
+        "text_col": text_col,
+    }
+
+
+def reconstruct(store: dict) -> pd.DataFrame:
+    """Rebuild the full per-occurrence line table from an interned store."""
+    occ = store["occurrences"]
+    lines = store["lines"].iloc[occ["line_id"]].reset_index(drop=True)
+    songs = store["songs"].iloc[occ["song_id"]].reset_index(drop=True)
+    return pd.concat([lines, songs, store["extra"]], axis=1)[store["columns"]]
+
+
+def song_lines(store: dict, song_id: int) -> pd.Series:
+    """Lyric lines of one song in order, without materializing the full table."""
+    occ = store["occurrences"]
+    mask = occ["song_id"] == song_id
+    order = np.argsort(occ["position"][mask], kind="stable")
+    return store["lines"][store["text_col"]].iloc[occ["line_id"][mask][order]].reset_index(drop=True)
+
+
+def save_store(store: dict, out_dir: Path):
+    """Write lines.csv, songs.csv, extra.csv, occurrences.npz and meta.json to out_dir."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    store["lines"].to_csv(out_dir / "lines.csv", index=False)
+    store["songs"].to_csv(out_dir / "songs.csv", index=False)
+    store["extra"].to_csv(out_dir / "extra.csv", index=False)
+    np.savez_compressed(out_dir / "occurrences.npz", **store["occurrences"])
+    with open(out_dir / "meta.json", "w", encoding="utf-8") as f:
+        json.dump({"columns": store["columns"], "text_col": store["text_col"]}, f)
+
+
+def load_store(store_dir: Path) -> dict:
+    """Inverse of save_store; tables come back in the compact schema."""
+    store_dir = Path(store_dir)
+    with np.load(store_dir / "occurrences.npz") as data:
+        occurrences = {k: data[k] for k in data.files}
+    with open(store_dir / "meta.json", "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    try:
+        extra = pd.read_csv(store_dir / "extra.csv")
+    except pd.errors.EmptyDataError:
+        # No per-occurrence columns: an empty frame still lines up with occurrences
+        extra = pd.DataFrame(index=range(len(occurrences["line_id"])))
+    return {
+        "lines": read_lines(store_dir / "lines.csv"),
+        "songs": apply_schema(pd.read_csv(store_dir / "songs.csv", dtype=str)),
+        "occurrences": occurrences,
+        "extra": extra,
+        "columns": meta["columns"],
+        "text_col": meta["text_col"],
+    }
+
+
+def main():
+    root = Path(__file__).resolve().parent
+    input_csv = root / "drake_kendrick_lyrics_with_emotions.csv"
+    out_dir = root / "lyrics_store"
+
+    df = read_lines(input_csv)
+    store = intern_lines(df)
+    save_store(store, out_dir)
+
+    print(f"Interned {len(df)} lines into {len(store['lines'])} unique lines across {len(store['songs'])} songs")
+    print(f"Wrote line store to: {out_dir}")
+
+
+if __name__ == "__main__":
+    main()
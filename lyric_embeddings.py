@@ -0,0 +1,102 @@
+import pandas as pd
+import numpy as np
+import scipy.sparse as sp
+
+
+def tokenize_lines(lines: pd.Series) -> pd.Series:
+    """Lowercase word lists with non-letters stripped (same rule as the word-count analysis)."""
+    return lines.str.lower().str.replace(r"[^a-z\s]", "", regex=True).str.split()
+
+
+def line_term_matrix(texts: pd.Series):
+    """Sparse (n_texts x n_terms) term-count matrix and its vocabulary."""
+    tokens = tokenize_lines(texts.reset_index(drop=True)).explode().dropna()
+    tokens = tokens[tokens != ""]
+    term_ids, vocab = pd.factorize(tokens)
+    rows = tokens.index.to_numpy()
+    counts = sp.csr_matrix(
+        (np.ones(len(term_ids), dtype=np.float32), (rows, term_ids)),
+        shape=(len(texts), len(vocab)),
+    )
+    counts.sum_duplicates()
+    return counts, np.asarray(vocab)
+
+
+def song_term_matrix(lines: pd.Series, song_ids: np.ndarray, n_songs: int):
+    """
+    Sparse (n_songs x n_terms) term counts.
+
+    Each distinct line is tokenized once; repeated hooks only add to a
+    song-by-line occurrence matrix, which is then multiplied through.
+    """
+    line_ids, uniques = pd.factorize(lines)
+    keep = (line_ids >= 0) & (song_ids >= 0)
+    occurrences = sp.csr_matrix(
+        (np.ones(int(keep.sum()), dtype=np.float32), (song_ids[keep], line_ids[keep])),
+        shape=(n_songs, len(uniques)),
+    )
+    line_terms, vocab = line_term_matrix(pd.Series(np.asarray(uniques, dtype=object)))
+    return (occurrences @ line_terms).tocsr(), vocab
+
+
+def tfidf(counts: sp.csr_matrix, min_df: int = 2) -> sp.csr_matrix:
+    """Sublinear TF-IDF with smoothed IDF and L2-normalized rows; drops terms in fewer than min_df songs."""
+    doc_freq = np.asarray((counts > 0).sum(axis=0)).ravel()
+    keep = np.flatnonzero(doc_freq >= min_df)
+    counts = counts[:, keep].tocsr()
+
+    weights = counts.copy()
+    weights.data = np.log1p(weights.data)
+    n_docs = counts.shape[0]
+    idf = np.log((1 + n_docs) / (1 + doc_freq[keep])) + 1
+    weights = weights @ sp.diags(idf.astype(np.float32))
+
+    norms = np.sqrt(np.asarray(weights.multiply(weights).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sp.diags((1.0 / norms).astype(np.float32)) @ weights
+
+
+def randomized_svd(A, n_components: int, n_oversamples: int = 10, n_iter: int = 4, seed: int = 0):
+    """
+    Truncated SVD of a sparse matrix by randomized range finding (Halko et al.).
+
+    Only products of A with thin dense matrices are formed, so memory is
+    O((n_rows + n_cols) * n_components). Returns (U, s, Vt).
+    """
+    rng = np.random.default_rng(seed)
+    n_components = min(n_components, min(A.shape))
+    size = min(n_components + n_oversamples, min(A.shape))
+
+    Q = A @ rng.standard_normal((A.shape[1], size)).astype(np.float32)
+    for _ in range(n_iter):
+        Q, _ = np.linalg.qr(Q)
+        Q, _ = np.linalg.qr(A.T @ Q)
+        Q = A @ Q
+    Q, _ = np.linalg.qr(Q)
+
+    B = np.asarray((A.T @ Q).T)
+    Ub, s, Vt = np.linalg.svd(B, full_matrices=False)
+    U = Q @ Ub
+    return U[:, :n_components], s[:n_components], Vt[:n_components]
+
+
+def embed_songs(
+    lines: pd.Series,
+    song_ids: np.ndarray,
+    n_songs: int,
+    n_components: int = 256,
+    min_df: int = 2,
+    seed: int = 0,
+) -> np.ndarray:
+    """
+    Dense (n_songs x n_components) lyric embeddings.
+
+    lines holds one lyric line per row and song_ids the row's song index in
+    [0, n_songs); rows with song_id -1 are ignored.
+    """
+    counts, _ = song_term_matrix(lines, np.asarray(song_ids), n_songs)
+    weights = tfidf(counts, min_df=min_df)
+    if weights.shape[1] == 0:
+        return np.zeros((n_songs, 0), dtype=np.float32)
+    U, s, _ = randomized_svd(weights, n_components, seed=seed)
+    return U * s
@@ -0,0 +1,87 @@
+import html
+import re
+
+import pandas as pd
+import numpy as np
+from pathlib import Path
+
+
+EMOTION_COLS = [
+    "anger_score",
+    "disgust_score",
+    "fear_score",
+    "joy_score",
+    "neutral_score",
+    "sadness_score",
+    "surprise_score",
+]
+
+SCORE_COLS = EMOTION_COLS + ["score"]
+CATEGORY_COLS = ["artist", "title", "url", "label"]
+
+ARTIST_ALIASES = {
+    "kendricklamar": "kendrick",
+    "kendrick": "kendrick",
+    "drake": "drake",
+}
+CANONICAL_ARTISTS = sorted(set(ARTIST_ALIASES.values()))
+
+
+def canonical_artist(name) -> str:
+    """Map spelling variants ('Kendrick Lamar', 'Kendrick_Lamar', 'Drake') to one name."""
+    text = str(name).strip()
+    key = text.lower().replace(" ", "").replace("_", "")
+    return ARTIST_ALIASES.get(key, text)
+
+
+def canonical_title(title) -> str:
+    """Unescape HTML entities and collapse whitespace in a song title."""
+    return re.sub(r"\s+", " ", html.unescape(str(title))).strip()
+
+
+def canonical_category(values, fn=None) -> pd.Categorical:
+    """
+    Store values as a categorical, applying fn once per distinct value.
+
+    Values that canonicalize to the same string share one category.
+    """
+    codes, uniques = pd.factorize(values)
+    uniques = np.asarray(uniques, dtype=object)
+    if fn is None:
+        return pd.Categorical.from_codes(codes, categories=pd.Index(uniques))
+
+    new_codes, categories = pd.factorize(pd.Index([fn(u) for u in uniques]))
+    codes = np.where(codes >= 0, new_codes[codes], -1)
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Canonicalize artist/title and shrink a line table's dtypes.
+
+    Artist, title, url and label become categoricals; score columns become
+    float32; pred becomes the smallest fitting integer type.
+    """
+    df = df.copy()
+    if "artist" in df.columns:
+        df["artist"] = canonical_category(df["artist"], canonical_artist)
+    if "title" in df.columns:
+        df["title"] = canonical_category(df["title"], canonical_title)
+    for col in ("url", "label"):
+        if col in df.columns:
+            df[col] = canonical_category(df[col])
+    for col in SCORE_COLS:
+        if col in df.columns:
+            df[col] = df[col].astype(np.float32)
+    if "pred" in df.columns and df["pred"].notna().all():
+        df["pred"] = pd.to_numeric(df["pred"], downcast="integer")
+    return df
+
+
+def read_lines(csv_path: Path, **kwargs) -> pd.DataFrame:
+    """Read a lyric line CSV straight into the compact schema."""
+    header = pd.read_csv(csv_path, nrows=0).columns
+    dtype = {c: "category" for c in CATEGORY_COLS if c in header}
+    dtype.update({c: np.float32 for c in SCORE_COLS if c in header})
+    dtype.update(kwargs.pop("dtype", {}))
+    return apply_schema(pd.read_csv(csv_path, dtype=dtype, **kwargs))
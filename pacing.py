@@ -0,0 +1,120 @@
+import random
+import threading
+import time
+
+
+OUTCOMES = ("ok", "captcha", "timeout", "error")
+
+
+class RateGovernor:
+    """
+    Token-bucket request pacer with AIMD rate control.
+
+    Every successful page nudges the rate up additively. A rising share of
+    timeouts/errors (an EWMA over recent outcomes) trims it multiplicatively
+    before the site starts blocking. A CAPTCHA halves it, starts a cooldown,
+    and caps future growth just below the rate that got blocked; repeated
+    CAPTCHAs double the cooldown until clean_reset clean pages in a row have
+    gone through. The cap slowly relaxes so the governor keeps probing for
+    the fastest sustainable rate. Report exactly one outcome per request.
+    Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        rate=0.5,
+        min_rate=0.02,
+        max_rate=5.0,
+        burst=1,
+        increase=0.02,
+        decrease=0.5,
+        soft_decrease=0.8,
+        warn_level=0.2,
+        window=20,
+        cooldown=60.0,
+        clean_reset=10,
+        jitter=0.2,
+    ):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self.soft_decrease = soft_decrease
+        self.warn_level = warn_level
+        self.window = window
+        self.cooldown = cooldown
+        self.clean_reset = clean_reset
+        self.jitter = jitter
+
+        self.ceiling = max_rate
+        self.bad_ewma = 0.0
+        self.tokens = float(burst)
+        self.last_refill = time.monotonic()
+        self.blocked_until = 0.0
+        self.since_decrease = 0
+        self.captcha_streak = 0
+        self.clean_streak = 0
+        self.counts = {outcome: 0 for outcome in OUTCOMES}
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Block until the next request may be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.blocked_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = max(self.blocked_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(delay * (1 + random.uniform(0, self.jitter)))
+
+    def record(self, outcome):
+        """Report one observed outcome: 'ok', 'captcha', 'timeout' or 'error'."""
+        if outcome not in OUTCOMES:
+            raise ValueError(f"Unknown outcome {outcome!r}; expected one of {OUTCOMES}")
+
+        with self._lock:
+            self.counts[outcome] += 1
+            self.since_decrease += 1
+            alpha = 1.0 / self.window
+            self.bad_ewma = (1 - alpha) * self.bad_ewma + alpha * (outcome in ("timeout", "error"))
+            if outcome != "ok":
+                self.clean_streak = 0
+
+            if outcome == "captcha":
+                self.captcha_streak += 1
+                self.ceiling = max(self.min_rate, self.rate * 0.9)
+                self._set_rate(self.rate * self.decrease)
+                self.blocked_until = time.monotonic() + self.cooldown * 2 ** min(self.captcha_streak - 1, 4)
+                self.tokens = 0.0
+                self.since_decrease = 0
+                return
+
+            if outcome == "ok":
+                self.clean_streak += 1
+                if self.clean_streak >= self.clean_reset:
+                    self.captcha_streak = 0
+                self._set_rate(self.rate + self.increase)
+                # Let the learned ceiling drift back up so the limit is re-probed
+                if self.since_decrease >= self.window:
+                    self.ceiling = min(self.max_rate, self.ceiling * 1.02)
+                    self.since_decrease = 0
+
+            if self.bad_ewma > self.warn_level and self.since_decrease >= self.window // 2:
+                self._set_rate(self.rate * self.soft_decrease)
+                self.since_decrease = 0
+
+    def stats(self):
+        """Current rate (requests/s) and outcome counts, for progress logs."""
+        with self._lock:
+            return {"rate": round(self.rate, 3), "ceiling": round(self.ceiling, 3), **self.counts}
+
+    def _set_rate(self, rate):
+        self.rate = min(max(rate, self.min_rate), self.ceiling, self.max_rate)
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
@@ -0,0 +1,381 @@
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from build_song_similarity_graph import build_edges_df, build_nodes_df, compute_song_level_stats
+from lyrics_schema import EMOTION_COLS, apply_schema, canonical_artist
+
+try:
+    from transformers import pipeline as hf_pipeline
+except ImportError:
+    hf_pipeline = None
+
+
+EMOTION_MODEL = "j-hartmann/emotion-english-distilroberta-base"
+SENTIMENT_MODEL = "siebert/sentiment-roberta-large-english"
+
+# Source directory -> artist used when a song JSON has no "artist" field
+METADATA_DIRS = {
+    "output_metadata/drake-only": "drake",
+    "output_metadata_goat/goat-only": "kendrick",
+}
+
+LINE_COLS = ["lyric", "artist", "title", "url"]
+SCORED_COLS = LINE_COLS + EMOTION_COLS + ["pred", "label", "score"]
+
+_DONE = object()
+
+
+def iter_metadata_songs(dirs=METADATA_DIRS, follow=False, poll_seconds=5.0, stop=None):
+    """
+    Yield (source_path, song dict) for scraped song JSON files.
+
+    With follow=True, keeps polling for files that a running scraper writes
+    and only returns once stop is set.
+    """
+    seen = set()
+    while True:
+        for folder, default_artist in dirs.items():
+            if not os.path.isdir(folder):
+                continue
+            for name in sorted(os.listdir(folder)):
+                path = os.path.join(folder, name)
+                if not name.endswith(".json") or path in seen:
+                    continue
+                seen.add(path)
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                except (OSError, json.JSONDecodeError):
+                    # Possibly mid-write; pick it up on the next poll
+                    seen.discard(path)
+                    continue
+                data.setdefault("artist", default_artist)
+                yield path, data
+        if not follow or (stop is not None and stop.is_set()):
+            return
+        time.sleep(poll_seconds)
+
+
+def normalize_song(song: dict) -> pd.DataFrame:
+    """
+    One song's lyric lines as a line table (lyric, artist, title, url).
+
+    Accepts lyrics as a list of lines or as the raw text the Google scraper
+    saves (with its leading "Lyrics" header). Lines of two characters or
+    fewer are dropped, as in the original notebook.
+    """
+    lyrics = song.get("lyrics") or []
+    if isinstance(lyrics, str):
+        lyrics = lyrics.splitlines()
+        if lyrics and lyrics[0].strip() == "Lyrics":
+            lyrics = lyrics[1:]
+    lines = [line.strip() for line in lyrics if len(line.strip()) > 2]
+
+    return pd.DataFrame({
+        "lyric": lines,
+        "artist": canonical_artist(song.get("artist", "")),
+        "title": song.get("title", ""),
+        "url": song.get("url", ""),
+    }, columns=LINE_COLS)
+
+
+def make_default_scorer(batch_size=32, device=None):
+    """
+    Emotion + sentiment scorer using the same models as the Colab notebooks.
+
+    Returns a function mapping a list of texts to a DataFrame with the
+    *_score, pred, label and score columns. Requires transformers.
+    """
+    if hf_pipeline is None:
+        raise ImportError("Scoring needs the transformers package (pip install transformers torch)")
+
+    emotion = hf_pipeline("text-classification", model=EMOTION_MODEL, top_k=None, device=device)
+    sentiment = hf_pipeline("sentiment-analysis", model=SENTIMENT_MODEL, device=device)
+
+    def score(texts):
+        emotion_out = emotion(texts, batch_size=batch_size, truncation=True)
+        sentiment_out = sentiment(texts, batch_size=batch_size, truncation=True)
+        rows = []
+        for emotions, sent in zip(emotion_out, sentiment_out):
+            row = {f"{e['label']}_score": e["score"] for e in emotions}
+            row["label"] = sent["label"]
+            row["score"] = sent["score"]
+            row["pred"] = int(sent["label"] == "POSITIVE")
+            rows.append(row)
+        return pd.DataFrame(rows, columns=EMOTION_COLS + ["pred", "label", "score"])
+
+    return score
+
+
+class CachedScorer:
+    """Wraps a scorer so each distinct line is only scored once per run."""
+
+    def __init__(self, scorer, max_entries=500_000):
+        self.scorer = scorer
+        self.max_entries = max_entries
+        self.cache = {}
+
+    def __call__(self, texts):
+        missing = list(dict.fromkeys(t for t in texts if t not in self.cache))
+        if missing:
+            scored = self.scorer(missing)
+            if len(self.cache) + len(missing) > self.max_entries:
+                self.cache.clear()
+            for text, row in zip(missing, scored.to_dict("records")):
+                self.cache[text] = row
+        return pd.DataFrame([self.cache[t] for t in texts], columns=EMOTION_COLS + ["pred", "label", "score"])
+
+
+def load_checkpoint(path: Path) -> set:
+    """Source files already processed by an earlier run."""
+    if not path.exists():
+        return set()
+    with open(path, "r", encoding="utf-8") as f:
+        return {line.rstrip("\n").split("\t")[0] for line in f if line.strip()}
+
+
+def committed_size(path: Path):
+    """
+    Size of the lines CSV at the last checkpointed song.
+
+    0 when nothing has been checkpointed yet; None when the last entry was
+    written by an older run that did not record sizes.
+    """
+    if not path.exists():
+        return 0
+    size = 0
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            fields = line.rstrip("\n").split("\t")
+            size = int(fields[1]) if len(fields) == 2 and fields[1].isdigit() else None
+    return size
+
+
+class StreamingPipeline:
+    """
+    scrape -> normalize -> score -> aggregate -> graph, one thread per stage.
+
+    Stages hand songs downstream through bounded queues, so a slow stage
+    applies backpressure instead of letting work pile up in memory. Scored
+    lines are appended to lines_csv as each song finishes, the source file is
+    then recorded in the checkpoint along with the CSV's new size, and the
+    graph tables are rewritten every write_every songs and at the end. A
+    restarted run first truncates lines_csv back to the last checkpointed
+    size, dropping rows from a song that crashed before its checkpoint, and
+    then skips checkpointed songs, so no song is counted twice.
+    """
+
+    def __init__(self, source, scorer, out_dir: Path, queue_size=32, threshold=0.99, write_every=50):
+        self.source = source
+        self.scorer = scorer
+        self.out_dir = Path(out_dir)
+        self.queue_size = queue_size
+        self.threshold = threshold
+        self.write_every = write_every
+
+        self.lines_csv = self.out_dir / "drake_kendrick_lyrics_with_emotions.csv"
+        self.checkpoint = self.out_dir / "pipeline_checkpoint.txt"
+        self.nodes_csv = self.out_dir / "song_nodes_emotion_space.csv"
+        self.edges_csv = self.out_dir / "song_edges_emotion_similarity.csv"
+
+        self.stop = threading.Event()
+        self.errors = []
+        self.counts = {"scraped": 0, "normalized": 0, "scored": 0, "aggregated": 0, "skipped": 0}
+        self._lock = threading.Lock()
+
+    def run(self):
+        """Run every stage to completion; re-raises the first stage error."""
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self._rollback_uncommitted()
+        done = load_checkpoint(self.checkpoint)
+        song_stats = self._load_existing_song_stats()
+
+        to_normalize = queue.Queue(self.queue_size)
+        to_score = queue.Queue(self.queue_size)
+        to_aggregate = queue.Queue(self.queue_size)
+
+        stages = [
+            threading.Thread(target=self._guard, args=(self._scrape_stage, done, to_normalize), name="scrape"),
+            threading.Thread(target=self._guard, args=(self._normalize_stage, to_normalize, to_score), name="normalize"),
+            threading.Thread(target=self._guard, args=(self._score_stage, to_score, to_aggregate), name="score"),
+            threading.Thread(target=self._guard, args=(self._aggregate_stage, to_aggregate, song_stats), name="aggregate"),
+        ]
+        for t in stages:
+            t.start()
+        try:
+            for t in stages:
+                while t.is_alive():
+                    t.join(timeout=0.5)
+        except KeyboardInterrupt:
+            self.stop.set()
+            for t in stages:
+                t.join()
+
+        if self.errors:
+            raise self.errors[0]
+        return self.counts
+
+    def _guard(self, stage, *args):
+        try:
+            stage(*args)
+        except Exception as e:
+            self.errors.append(e)
+            self.stop.set()
+
+    def _put(self, q, item):
+        # Blocks while the downstream queue is full (backpressure), but stays stoppable
+        while not self.stop.is_set():
+            try:
+                q.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q):
+        while not self.stop.is_set():
+            try:
+                return q.get(timeout=0.5)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _bump(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def _scrape_stage(self, done, out_q):
+        try:
+            for path, song in self.source(stop=self.stop):
+                if self.stop.is_set():
+                    break
+                if path in done:
+                    self._bump("skipped")
+                    continue
+                self._bump("scraped")
+                if not self._put(out_q, (path, song)):
+                    break
+        finally:
+            self._put(out_q, _DONE)
+
+    def _normalize_stage(self, in_q, out_q):
+        try:
+            while (item := self._get(in_q)) is not _DONE:
+                path, song = item
+                lines = normalize_song(song)
+                self._bump("normalized")
+                if not self._put(out_q, (path, lines)):
+                    break
+        finally:
+            self._put(out_q, _DONE)
+
+    def _score_stage(self, in_q, out_q):
+        try:
+            while (item := self._get(in_q)) is not _DONE:
+                path, lines = item
+                if len(lines):
+                    scores = self.scorer(lines["lyric"].tolist())
+                    lines = pd.concat([lines.reset_index(drop=True), scores.reset_index(drop=True)], axis=1)
+                else:
+                    lines = pd.DataFrame(columns=SCORED_COLS)
+                self._bump("scored")
+                if not self._put(out_q, (path, lines[SCORED_COLS])):
+                    break
+        finally:
+            self._put(out_q, _DONE)
+
+    def _aggregate_stage(self, in_q, song_stats):
+        since_write = 0
+        while (item := self._get(in_q)) is not _DONE:
+            path, lines = item
+            if len(lines):
+                lines.to_csv(self.lines_csv, mode="a", header=not self._has_lines(), index=False)
+                stats = compute_song_level_stats(apply_schema(lines))
+                for _, row in stats.iterrows():
+                    song_stats[(row["artist"], row["title"])] = row
+            size = self.lines_csv.stat().st_size if self.lines_csv.exists() else 0
+            with open(self.checkpoint, "a", encoding="utf-8") as f:
+                f.write(f"{path}\t{size}\n")
+            self._bump("aggregated")
+
+            since_write += 1
+            if since_write >= self.write_every:
+                self._write_graph(song_stats)
+                since_write = 0
+
+        self._write_graph(song_stats)
+
+    def _rollback_uncommitted(self):
+        size = committed_size(self.checkpoint)
+        if size is None or not self.lines_csv.exists() or self.lines_csv.stat().st_size <= size:
+            return
+        print(f"Dropping {self.lines_csv.stat().st_size - size} bytes of uncheckpointed lines from {self.lines_csv}")
+        if size == 0:
+            self.lines_csv.unlink()
+            return
+        with open(self.lines_csv, "r+b") as f:
+            f.truncate(size)
+
+    def _has_lines(self):
+        return self.lines_csv.exists() and self.lines_csv.stat().st_size > 0
+
+    def _load_existing_song_stats(self) -> dict:
+        if not self._has_lines():
+            return {}
+        stats = compute_song_level_stats(apply_schema(pd.read_csv(self.lines_csv)))
+        return {(row["artist"], row["title"]): row for _, row in stats.iterrows()}
+
+    def _write_graph(self, song_stats):
+        if not song_stats:
+            return
+        table = pd.DataFrame(list(song_stats.values())).reset_index(drop=True)
+        build_nodes_df(table).to_csv(self.nodes_csv, index=False)
+        build_edges_df(table, threshold=self.threshold).to_csv(self.edges_csv, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream scraped songs through normalize, score and graph stages.")
+    parser.add_argument("--out-dir", default="pipeline_output")
+    parser.add_argument("--follow", action="store_true", help="keep watching for songs a running scraper writes")
+    parser.add_argument("--queue-size", type=int, default=32)
+    parser.add_argument("--threshold", type=float, default=0.99)
+    parser.add_argument("--write-every", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    root = Path(__file__).resolve().parent
+    os.chdir(root)
+    if (root / args.out_dir).resolve() == root:
+        # The pipeline owns (and on restart truncates) its lines CSV, which here would be the dataset itself
+        parser.error("--out-dir must not be the repository root")
+
+    def source(stop):
+        return iter_metadata_songs(follow=args.follow, stop=stop)
+
+    runner = StreamingPipeline(
+        source,
+        CachedScorer(make_default_scorer(batch_size=args.batch_size)),
+        root / args.out_dir,
+        queue_size=args.queue_size,
+        threshold=args.threshold,
+        write_every=args.write_every,
+    )
+    counts = runner.run()
+
+    print(f"Pipeline finished: {counts}")
+    print(f"Wrote lines to: {runner.lines_csv}")
+    print(f"Wrote nodes to: {runner.nodes_csv}")
+    print(f"Wrote edges to: {runner.edges_csv}")
+
+
+if __name__ == "__main__":
+    main()
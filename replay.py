@@ -0,0 +1,252 @@
+import argparse
+import hashlib
+import html
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qsl, quote, urlencode, urlsplit
+
+
+# Query parameters that vary between visits to the same page
+VOLATILE_PARAMS = {"solved", "sei", "ei", "ved", "sa", "source", "sxsrf", "biw", "bih"}
+
+
+def recording_key(url):
+    """Host-independent key for a page: path plus its stable query parameters."""
+    parts = urlsplit(url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query) if k not in VOLATILE_PARAMS)
+    return parts.path + ("?" + urlencode(query) if query else "")
+
+
+def record_page(driver, url, record_dir=None):
+    """
+    Save the rendered page for url when recording is on.
+
+    Recording is on when record_dir is given or SCRAPE_RECORD_DIR is set;
+    otherwise this is a no-op. Pages go to <dir>/pages/<sha1>.html with one
+    line per page appended to <dir>/index.jsonl.
+    """
+    record_dir = record_dir or os.environ.get("SCRAPE_RECORD_DIR")
+    if not record_dir:
+        return
+
+    key = recording_key(url)
+    filename = hashlib.sha1(key.encode("utf-8")).hexdigest() + ".html"
+    pages_dir = Path(record_dir) / "pages"
+    pages_dir.mkdir(parents=True, exist_ok=True)
+    with open(pages_dir / filename, "w", encoding="utf-8") as f:
+        f.write(driver.page_source)
+    with open(Path(record_dir) / "index.jsonl", "a", encoding="utf-8") as f:
+        f.write(json.dumps({"key": key, "url": url, "file": filename}, ensure_ascii=False) + "\n")
+
+
+def load_recordings(record_dir):
+    """{key: html} for every recorded page; later recordings of a key win."""
+    record_dir = Path(record_dir)
+    files = {}
+    with open(record_dir / "index.jsonl", "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                files[entry["key"]] = entry["file"]
+    return {key: (record_dir / "pages" / name).read_text(encoding="utf-8") for key, name in files.items()}
+
+
+CAPTCHA_PAGE = """<html><head><meta http-equiv="refresh" content="{delay};url={target}"></head>
+<body><p>Our systems have detected unusual traffic from your computer network.</p></body></html>"""
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    """Serves recorded pages with simulated latency, dropped connections and Google CAPTCHAs."""
+
+    def do_GET(self):
+        server = self.server
+        delay = server.latency * (1 + server.rng_uniform(-server.jitter, server.jitter))
+        time.sleep(max(delay, 0))
+
+        parts = urlsplit(self.path)
+        query = dict(parse_qsl(parts.query))
+
+        if parts.path.startswith("/sorry/"):
+            # The "human" solves the CAPTCHA after captcha_delay seconds
+            server.count("captcha_page")
+            target = query.get("continue", "/")
+            self._send(200, CAPTCHA_PAGE.format(delay=server.captcha_delay, target=html.escape(target)))
+            return
+
+        if server.rng_uniform(0, 1) < server.failure_rate:
+            # Hang up without a response. Chrome would render an HTTP error page
+            # without complaint, but a dropped connection (net::ERR_EMPTY_RESPONSE)
+            # makes driver.get raise, so the scraper reports it to the pacer.
+            server.count("failure")
+            self.close_connection = True
+            return
+
+        if parts.path == "/search" and "solved" not in query and server.rng_uniform(0, 1) < server.captcha_rate:
+            server.count("captcha")
+            target = self.path + ("&" if parts.query else "?") + "solved=1"
+            self.send_response(302)
+            self.send_header("Location", "/sorry/index?continue=" + quote(target, safe=""))
+            self.end_headers()
+            return
+
+        page = server.pages.get(recording_key(self.path))
+        if page is None:
+            server.count("missing")
+            self._send(404, "<html><body>Not Found</body></html>")
+            return
+
+        server.count("served")
+        self._send(200, page)
+
+    def _send(self, status, body):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ReplayServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, pages, latency=0.2, jitter=0.5, captcha_rate=0.0,
+                 failure_rate=0.0, captcha_delay=3, seed=0):
+        super().__init__(address, ReplayHandler)
+        self.pages = pages
+        self.latency = latency
+        self.jitter = jitter
+        self.captcha_rate = captcha_rate
+        self.failure_rate = failure_rate
+        self.captcha_delay = captcha_delay
+        self.stats = {"served": 0, "missing": 0, "failure": 0, "captcha": 0, "captcha_page": 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def rng_uniform(self, a, b):
+        with self._lock:
+            return self._rng.uniform(a, b)
+
+    def count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+
+def start_server(record_dir, host="127.0.0.1", port=0, **kwargs):
+    """Start a ReplayServer on a background thread and return it."""
+    server = ReplayServer((host, port), load_recordings(record_dir), **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_benchmark(record_dir, songs_file, limit=None, headless=True, **server_kwargs):
+    """
+    Time scrapper.main end to end against a replay server.
+
+    Runs in a scratch directory so real output_metadata is never touched.
+    Returns a dict of timings, songs/s and server counters.
+    """
+    server = start_server(record_dir, **server_kwargs)
+    old_cwd = os.getcwd()
+    old_env = {k: os.environ.get(k) for k in ("GOOGLE_BASE_URL", "GENIUS_BASE_URL")}
+    os.environ["GOOGLE_BASE_URL"] = server.base_url
+    os.environ["GENIUS_BASE_URL"] = server.base_url
+
+    songs = [line for line in Path(songs_file).read_text(encoding="utf-8").splitlines() if line.strip()]
+    if limit:
+        songs = songs[:limit]
+
+    work = tempfile.mkdtemp(prefix="scrape_bench_")
+    try:
+        os.makedirs(os.path.join(work, "drake"))
+        with open(os.path.join(work, "drake", "all_songs.txt"), "w", encoding="utf-8") as f:
+            f.write("\n".join(songs) + "\n")
+        os.chdir(work)
+
+        import scrapper
+
+        start = time.perf_counter()
+        scrapper.main(headless=headless)
+        elapsed = time.perf_counter() - start
+
+        written = sum(len(files) for _, _, files in os.walk(os.path.join(work, "output_metadata")))
+    finally:
+        os.chdir(old_cwd)
+        for k, v in old_env.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+        server.shutdown()
+        shutil.rmtree(work, ignore_errors=True)
+
+    return {
+        "songs": len(songs),
+        "written": written,
+        "seconds": round(elapsed, 2),
+        "songs_per_second": round(len(songs) / elapsed, 3) if elapsed else None,
+        **server.stats,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded scraper pages offline.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    for name in ("serve", "bench"):
+        p = sub.add_parser(name)
+        p.add_argument("--dir", default="recordings", help="directory written with SCRAPE_RECORD_DIR")
+        p.add_argument("--latency", type=float, default=0.2, help="mean response delay in seconds")
+        p.add_argument("--jitter", type=float, default=0.5, help="relative +/- spread of the delay")
+        p.add_argument("--captcha-rate", type=float, default=0.0)
+        p.add_argument("--failure-rate", type=float, default=0.0, help="share of requests dropped without a response")
+        p.add_argument("--captcha-delay", type=int, default=3, help="seconds before a CAPTCHA 'solves' itself")
+        p.add_argument("--seed", type=int, default=0)
+
+    sub.choices["serve"].add_argument("--port", type=int, default=8765)
+    sub.choices["bench"].add_argument("--songs", default="drake/all_songs.txt")
+    sub.choices["bench"].add_argument("--limit", type=int, default=None)
+
+    args = parser.parse_args()
+    server_kwargs = {
+        "latency": args.latency,
+        "jitter": args.jitter,
+        "captcha_rate": args.captcha_rate,
+        "failure_rate": args.failure_rate,
+        "captcha_delay": args.captcha_delay,
+        "seed": args.seed,
+    }
+
+    if args.command == "serve":
+        server = ReplayServer(("127.0.0.1", args.port), load_recordings(args.dir), **server_kwargs)
+        print(f"Replaying {len(server.pages)} pages at {server.base_url}")
+        print(f"Run scrapers with GOOGLE_BASE_URL={server.base_url} GENIUS_BASE_URL={server.base_url}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            print(f"Server stats: {server.stats}")
+    else:
+        songs_file = Path(args.songs).resolve()
+        result = run_benchmark(args.dir, songs_file, limit=args.limit, **server_kwargs)
+        print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
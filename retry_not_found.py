@@ -1,69 +1,40 @@
 import os
 import json
 import time
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 
-def setup_driver(headless=False):
-    opts = Options()
-    
-    # Basic headless mode
-    if headless:
-        opts.add_argument("--headless=new")
-    
-    # Mimic real browser behavior
-    opts.add_argument("--disable-blink-features=AutomationControlled")
-    opts.add_experimental_option("excludeSwitches", ["enable-automation"])
-    opts.add_experimental_option('useAutomationExtension', False)
-    opts.add_experimental_option("detach", True)
-    
-    # Set realistic user agent
-    opts.add_argument("user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-    
-    # Window size
-    opts.add_argument("--window-size=1920,1080")
-    opts.add_argument("--start-maximized")
-    
-    # Additional flags
-    opts.add_argument("--no-sandbox")
-    opts.add_argument("--disable-dev-shm-usage")
-    opts.add_argument("--disable-gpu")
-    opts.add_argument("--disable-extensions")
-    opts.add_argument("--disable-infobars")
-    opts.add_argument("--lang=en-US,en;q=0.9")
-    opts.add_argument("--disable-notifications")    
-    
-    driver = webdriver.Chrome(options=opts)
-    
-    # Set page load timeout to 5 seconds
-    driver.set_page_load_timeout(5)
-    
-    # Remove webdriver property
-    driver.execute_cdp_cmd('Network.setUserAgentOverride', {
-        "userAgent": 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-    })
-    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-    
-    return driver
+from browser import DriverManager, genius_url
+from pacing import RateGovernor
+from replay import record_page
 
-def extract_genius_lyrics(driver, url, wait_time=30):
+def extract_genius_lyrics(driver, url, wait_time=30, governor=None):
     """
     Navigate to Genius URL and extract lyrics.
     Waits for captcha to be resolved if needed.
     """
     print(f"  → Navigating to: {url}")
     
-    # Try to load the page with timeout
+    # Try to load the page with timeout. The pacer gets one outcome per page,
+    # recorded once extraction is done: a load that timed out but still
+    # yielded lyrics is "ok", and missing lyric selectors on a page that
+    # loaded are not a network problem either.
+    outcome = "ok"
     try:
-        driver.get(url)
-    except Exception as e:
+        driver.get(genius_url(url))
+    except TimeoutException:
         # Page load timeout - that's okay, we'll work with what loaded
         print(f"  ⚠️  Page load timed out after 5 seconds (continuing anyway)")
+        outcome = "timeout"
+    except Exception as e:
+        print(f"  ⚠️  Page load failed: {e} (continuing anyway)")
+        outcome = "error"
 
+    record_page(driver, url)
     
+    found = False
     try:
         # Try to find lyrics container on Genius
         # Genius uses different selectors - we'll try multiple approaches
@@ -83,6 +54,7 @@ def extract_genius_lyrics(driver, url, wait_time=30):
             except:
                 title = None
             
+            found = True
             return lyrics_text, title
         
         raise Exception("Could not find lyrics container on page")
@@ -90,8 +62,11 @@ def extract_genius_lyrics(driver, url, wait_time=30):
     except Exception as e:
         print(f"  ✗ Error extracting lyrics: {str(e)}")
         raise
+    finally:
+        if governor is not None:
+            governor.record("ok" if found else outcome)
 
-def process_not_found_files(artist_name="drake"):
+def process_not_found_files(artist_name="drake", headless=False):
     """
     Process all files in the not-found directory for a given artist.
     """
@@ -111,7 +86,8 @@ def process_not_found_files(artist_name="drake"):
     print(f"Processing {total} files from {not_found_dir}")
     print(f"{'='*60}\n")
     
-    driver = setup_driver(headless=False)
+    drivers = DriverManager(headless=headless, page_load_timeout=5)
+    governor = RateGovernor()
     
     try:
         processed = 0
@@ -138,7 +114,8 @@ def process_not_found_files(artist_name="drake"):
             
             try:
                 # Extract lyrics from Genius
-                lyrics_text, page_title = extract_genius_lyrics(driver, url)
+                governor.wait()
+                lyrics_text, page_title = extract_genius_lyrics(drivers.acquire(), url, governor=governor)
                 
                 # Determine category (use page_title if available, otherwise fall back to title)
                 check_title = page_title if page_title else title
@@ -172,9 +149,6 @@ def process_not_found_files(artist_name="drake"):
                 
                 successful += 1
                 
-                # Polite delay between requests
-                time.sleep(5)
-                
             except Exception as e:
                 print(f"  ✗ FAILED: {str(e)}")
                 failed += 1
@@ -184,9 +158,6 @@ def process_not_found_files(artist_name="drake"):
                 data['last_attempt'] = time.strftime('%Y-%m-%d %H:%M:%S')
                 with open(filepath, 'w', encoding='utf-8') as f:
                     json.dump(data, f, ensure_ascii=False, indent=2)
-                
-                # Continue to next file
-                time.sleep(1)
             
             processed += 1
             
@@ -195,6 +166,7 @@ def process_not_found_files(artist_name="drake"):
                 print(f"\n{'='*60}")
                 print(f"Progress: {processed}/{total} processed")
                 print(f"Success: {successful} | Failed: {failed}")
+                print(f"Pacing: {governor.stats()}")
                 print(f"{'='*60}\n")
     
     finally:
@@ -209,7 +181,7 @@ def process_not_found_files(artist_name="drake"):
         
         # Keep browser open for inspection
         input("\nPress Enter to close browser...")
-        driver.quit()
+        drivers.quit()
 
 if __name__ == "__main__":
     # Process Drake songs first
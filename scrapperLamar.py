@@ -4,51 +4,15 @@ import time
 import re
 from urllib.parse import quote_plus
 
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, WebDriverException
 
-def setup_driver(headless=True):
-    opts = Options()
-    
-    # Basic headless mode
-    if headless:
-        opts.add_argument("--headless=new")  # Use new headless mode
-    
-    # Mimic real browser behavior
-    opts.add_argument("--disable-blink-features=AutomationControlled")
-    opts.add_experimental_option("excludeSwitches", ["enable-automation"])
-    opts.add_experimental_option('useAutomationExtension', False)
-    opts.add_experimental_option("detach", True)
-    
-    # Set realistic user agent
-    opts.add_argument("user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-    
-    # Window size to mimic real browser
-    opts.add_argument("--window-size=1920,1080")
-    opts.add_argument("--start-maximized")
-    
-    # Additional flags for stability and stealth
-    opts.add_argument("--no-sandbox")
-    opts.add_argument("--disable-dev-shm-usage")
-    opts.add_argument("--disable-gpu")
-    opts.add_argument("--disable-extensions")
-    opts.add_argument("--disable-infobars")
-    opts.add_argument("--lang=en-US,en;q=0.9")
-    opts.add_argument("--disable-notifications")    
-    
-    driver = webdriver.Chrome(options=opts)
-    
-    # Remove webdriver property to further avoid detection
-    driver.execute_cdp_cmd('Network.setUserAgentOverride', {
-        "userAgent": 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-    })
-    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-    
-    return driver
+from browser import DriverManager, google_base_url
+from pacing import RateGovernor
+from replay import record_page
 
 def extract_link_and_title(html_snippet):
     # simplistic extraction; adjust if structure differs
@@ -59,15 +23,29 @@ def extract_link_and_title(html_snippet):
     title = m2.group(1).strip() if m2 else None
     return url, title
 
-def google_search_lyrics(driver, query, wait_time=10):
+def google_search_lyrics(driver, query, wait_time=10, governor=None):
     # Navigate directly to the Google search URL
-    search_url = f"https://www.google.com/search?q={quote_plus(query + ' lyrics')}"
-    driver.get(search_url)
+    search_url = f"{google_base_url()}/search?q={quote_plus(query + ' lyrics')}"
+    try:
+        driver.get(search_url)
+    except TimeoutException:
+        if governor is not None:
+            governor.record("timeout")
+        raise
+    except WebDriverException:
+        if governor is not None:
+            governor.record("error")
+        raise
     wait = WebDriverWait(driver, wait_time)
 
     # Check if we're on the search results page (not CAPTCHA or redirect)
     # CAPTCHA URLs contain /sorry/ in the path
-    while "/sorry/" in driver.current_url or not driver.current_url.startswith("https://www.google.com/search"):
+    blocked = "/sorry/" in driver.current_url
+    if governor is not None:
+        # One outcome per request: a CAPTCHA slows the pacer down; anything the
+        # page does or doesn't contain after it loaded is not a network problem
+        governor.record("captcha" if blocked else "ok")
+    while "/sorry/" in driver.current_url or not driver.current_url.startswith(f"{google_base_url()}/search"):
         print("⚠️  CAPTCHA or redirect detected!")
         print(f"Current URL: {driver.current_url}")
         print("Please solve the CAPTCHA manually in the browser window.")
@@ -79,6 +57,8 @@ def google_search_lyrics(driver, query, wait_time=10):
     try:            
         # Wait for results to load
         time.sleep(5)
+        # Record what the extraction below actually reads
+        record_page(driver, search_url)
 
         # get all elements with class JCZQSb
         links = driver.find_elements(By.CSS_SELECTOR, ".JCZQSb")
@@ -93,7 +73,7 @@ def google_search_lyrics(driver, query, wait_time=10):
                 artist = artist.split("Artist: ")[1]
                 break
 
-        return lyrics_text, artist
+        return lyrics_text, artist, blocked
     except Exception as e:
         
         print("ELEMENTS FOUND: ", driver.find_element(By.CSS_SELECTOR, ".JCZQSb").text)
@@ -101,7 +81,7 @@ def google_search_lyrics(driver, query, wait_time=10):
         # throw error
         raise e
 
-def main():
+def main(headless=False):
     # Example list of html snippet(s)
 
     all_drake_songs = []
@@ -114,8 +94,10 @@ def main():
 
     html_snippets = all_drake_songs
 
-    # keep driver open for debugging
-    driver = setup_driver(headless=False)
+    # Visible browser so CAPTCHAs can be solved by hand; recycled to keep memory flat
+    # SCRAPE_PROFILE_DIR keeps cookies (and solved CAPTCHAs) across recycles
+    drivers = DriverManager(headless=headless, user_data_dir=os.environ.get("SCRAPE_PROFILE_DIR"))
+    governor = RateGovernor()
     
     try:
         for html in html_snippets:
@@ -150,7 +132,10 @@ def main():
             # Search Google and extract lyrics
             try:
                 search_query = f"{title} Kendrick Lamar"
-                lyrics_text, artist = google_search_lyrics(driver, search_query)
+                governor.wait()
+                lyrics_text, artist, blocked = google_search_lyrics(drivers.acquire(), search_query, governor=governor)
+                if blocked:
+                    drivers.captcha_solved()
                 print("Lyrics:", lyrics_text[:100] + "..." if len(lyrics_text) > 100 else lyrics_text)
                 print("Artist:", artist)
 
@@ -187,11 +172,8 @@ def main():
                     json.dump(data, f, ensure_ascii=False, indent=2)
                 print("✓ Saved to not-found:", filename)
 
-            time.sleep(1)  # avoid too fast
-
     finally:
-        # leave open for debugging
-        pass 
+        drivers.quit()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,75 @@
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from genius_catalog import PER_PAGE, GeniusClient, MockGeniusServer, discover_catalog, load_catalog
+from pacing import RateGovernor
+
+
+@pytest.fixture
+def server():
+    server = MockGeniusServer(n_songs=300, latency=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def sync(server, tmp_path):
+    client = GeniusClient(
+        "test-token",
+        base_url=server.base_url,
+        cache_dir=tmp_path / "cache",
+        workers=4,
+        governor=RateGovernor(rate=1000, max_rate=1000, burst=4, jitter=0),
+    )
+    catalog_path = tmp_path / "drake.json"
+
+    def run(**kwargs):
+        before = server.requests
+        added = discover_catalog(client, "Drake", catalog_path, **kwargs)
+        return {int(s["id"]) for s in added}, server.requests - before
+
+    run.catalog_path = catalog_path
+    return run
+
+
+def test_first_sync_finds_every_song(sync):
+    added, _ = sync()
+    assert added == set(range(1, 301))
+    assert len(load_catalog(sync.catalog_path)["songs"]) == 300
+
+
+def test_incremental_sync_finds_new_songs_without_walking_everything(server, sync):
+    sync()
+    server.add_songs(20)
+
+    added, requests = sync()
+    assert added == set(range(301, 321))
+    assert requests < 300 // PER_PAGE
+
+    added, _ = sync()
+    assert added == set()
+
+
+def test_incremental_sync_does_not_stop_on_a_page_of_features(server, sync):
+    sync()
+    server.add_songs(10)
+    server.add_songs(PER_PAGE, featured=True)
+
+    added, _ = sync()
+    assert added == set(range(301, 311))
+
+
+def test_full_sync_refetches_listings(server, sync):
+    sync(incremental=False)
+    server.add_songs(20)
+
+    added, requests = sync(incremental=False)
+    assert added == set(range(301, 321))
+    assert requests >= 320 // PER_PAGE